@@ -1,49 +1,42 @@
+import importlib
+import importlib.util
 import json
+import logging
+import math
 import os
+import queue
+import re
+import shutil
 import sys
 import threading
 import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-try:
-    from PIL import Image  # for tray icon creation only
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
+# Optional dependencies (PIL, toast, tray & video backends) are imported on
+# first use by the _try_import_* helpers below; None means "not probed yet".
+Image = None
+PIL_AVAILABLE = None
 
-# Optional: system tray & toast & video
-try:
-    import pystray
-    from PIL import Image as PILImage
-    TRAY_AVAILABLE = True
-except Exception:
-    TRAY_AVAILABLE = False
+ToastNotifier = None
+TOAST_AVAILABLE = None
 
-try:
-    from win10toast import ToastNotifier
-    TOAST_AVAILABLE = True
-except Exception:
-    TOAST_AVAILABLE = False
+ToastNotificationManager = None
+ToastNotification = None
+XmlDocument = None
+WINRT_TOAST_AVAILABLE = None
 
-# Video playback backends
-try:
-    from tkintervideo import TkinterVideo
-    TKINTERVIDEO_AVAILABLE = True
-except Exception:
-    TKINTERVIDEO_AVAILABLE = False
+pystray = None
+TRAY_AVAILABLE = None
 
-try:
-    import vlc
-    VLC_AVAILABLE = True
-except Exception:
-    VLC_AVAILABLE = False
+TkinterVideo = None
+TKINTERVIDEO_AVAILABLE = None
 
-try:
-    import cv2
-    OPENCV_AVAILABLE = True
-except Exception:
-    OPENCV_AVAILABLE = False
+vlc = None
+VLC_AVAILABLE = None
+
+cv2 = None
+OPENCV_AVAILABLE = None
 
 # --- NEW IMPORTS FOR LOCK SCREEN ---
 import subprocess # For macOS lock screen
@@ -53,21 +46,126 @@ try:
 except Exception:
     WINDOWS_LOCK_AVAILABLE = False
 
-# For checking screen lock status on Windows
-if sys.platform.startswith("win"):
-    try:
-        import win32event
-        import win32gui
-        import win32con
-        import win32api
-        WINDOWS_SCREEN_STATUS_AVAILABLE = True
-    except ImportError:
-        WINDOWS_SCREEN_STATUS_AVAILABLE = False
-else:
-    WINDOWS_SCREEN_STATUS_AVAILABLE = False
+# 默认不输出日志；需要时在外部调用 logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger("countime")
+log.addHandler(logging.NullHandler())
+
+# Win32 constants for screen lock/unlock (WTS session) notifications
+WM_WTSSESSION_CHANGE = 0x02B1
+WTS_SESSION_LOCK = 0x7
+WTS_SESSION_UNLOCK = 0x8
+NOTIFY_FOR_ALL_SESSIONS = 1
+GWLP_WNDPROC = -4
+HWND_MESSAGE = -3
 # --- END NEW IMPORTS ---
 
 
+def _module_installed(name: str) -> bool:
+    """只查找模块而不导入，用于判断可选依赖是否已安装。"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except Exception:
+        return False
+
+
+def _try_import_pil() -> bool:
+    global Image, PIL_AVAILABLE
+    if PIL_AVAILABLE is None:
+        try:
+            from PIL import Image as _Image
+            Image = _Image
+            PIL_AVAILABLE = True
+        except Exception:
+            PIL_AVAILABLE = False
+    return PIL_AVAILABLE
+
+
+def _try_import_win10toast() -> bool:
+    global ToastNotifier, TOAST_AVAILABLE
+    if TOAST_AVAILABLE is None:
+        try:
+            from win10toast import ToastNotifier as _ToastNotifier
+            ToastNotifier = _ToastNotifier
+            TOAST_AVAILABLE = True
+        except Exception:
+            TOAST_AVAILABLE = False
+    return TOAST_AVAILABLE
+
+
+def _try_import_winrt_toast() -> bool:
+    global ToastNotificationManager, ToastNotification, XmlDocument, WINRT_TOAST_AVAILABLE
+    if WINRT_TOAST_AVAILABLE is None:
+        WINRT_TOAST_AVAILABLE = False
+        # winsdk 与 winrt 提供相同的 WinRT 投影，任选其一
+        for pkg in ("winsdk", "winrt"):
+            try:
+                notifications = importlib.import_module(f"{pkg}.windows.ui.notifications")
+                dom = importlib.import_module(f"{pkg}.windows.data.xml.dom")
+            except Exception:
+                continue
+            ToastNotificationManager = notifications.ToastNotificationManager
+            ToastNotification = notifications.ToastNotification
+            XmlDocument = dom.XmlDocument
+            WINRT_TOAST_AVAILABLE = True
+            break
+    return WINRT_TOAST_AVAILABLE
+
+
+def _try_import_pystray() -> bool:
+    global pystray, TRAY_AVAILABLE
+    if TRAY_AVAILABLE is None:
+        try:
+            import pystray as _pystray
+            if not _try_import_pil():
+                raise ImportError("PIL is required for the tray icon")
+            pystray = _pystray
+            TRAY_AVAILABLE = True
+        except Exception:
+            TRAY_AVAILABLE = False
+    return TRAY_AVAILABLE
+
+
+def _try_import_tkintervideo() -> bool:
+    global TkinterVideo, TKINTERVIDEO_AVAILABLE
+    if TKINTERVIDEO_AVAILABLE is None:
+        try:
+            from tkintervideo import TkinterVideo as _TkinterVideo
+            TkinterVideo = _TkinterVideo
+            TKINTERVIDEO_AVAILABLE = True
+        except Exception:
+            TKINTERVIDEO_AVAILABLE = False
+    return TKINTERVIDEO_AVAILABLE
+
+
+def _try_import_vlc() -> bool:
+    global vlc, VLC_AVAILABLE
+    if VLC_AVAILABLE is None:
+        try:
+            # libvlc must be discoverable before python-vlc is imported
+            prepare_vlc_on_windows()
+        except Exception:
+            pass
+        try:
+            import vlc as _vlc
+            vlc = _vlc
+            VLC_AVAILABLE = True
+        except Exception:
+            VLC_AVAILABLE = False
+    return VLC_AVAILABLE
+
+
+def _try_import_cv2() -> bool:
+    global cv2, OPENCV_AVAILABLE
+    if OPENCV_AVAILABLE is None:
+        try:
+            import cv2 as _cv2
+            cv2 = _cv2
+            OPENCV_AVAILABLE = True
+        except Exception:
+            OPENCV_AVAILABLE = False
+    return OPENCV_AVAILABLE
+
+
 def prepare_vlc_on_windows() -> bool:
     """Try to make python-vlc find libvlc on Windows by adding DLL dirs.
     Returns True if a candidate directory was added.
@@ -97,50 +195,158 @@ def prepare_vlc_on_windows() -> bool:
     return False
 
 
+def _probe_video_dims(path):
+    """用 ffprobe 只解析容器头读取视频分辨率，返回 (width, height)；
+    ffprobe 不可用或解析失败时返回 None。
+    """
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    try:
+        out = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x", path],
+            capture_output=True, text=True, timeout=1,
+            # 避免在 pythonw 下弹出控制台窗口
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        ).stdout.strip()
+        w, h = out.splitlines()[0].split("x")[:2]
+        return int(w), int(h)
+    except Exception:
+        return None
+
+
+def _open_capture(path):
+    """打开本地视频文件：直接指定 FFmpeg 后端，省去 OpenCV 逐个试探后端的耗时，失败再回退 CAP_ANY。"""
+    cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+    if not cap.isOpened():
+        cap.release()
+        cap = cv2.VideoCapture(path, cv2.CAP_ANY)
+    if cap.isOpened():
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 不支持的后端会忽略
+    return cap
+
+
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
 
 
+# 托盘图标只绘制一次，托盘开关切换时直接复用
+_TRAY_ICON_IMG = None
+
+
+def _make_tray_icon():
+    """返回托盘图标（64×64 蓝底白点），首次调用时绘制并缓存。需先导入 PIL。"""
+    global _TRAY_ICON_IMG
+    if _TRAY_ICON_IMG is None:
+        img = Image.new("RGBA", (64, 64), (30, 144, 255, 255))
+        # draw a simple dot/letter
+        try:
+            from PIL import ImageDraw
+            d = ImageDraw.Draw(img)
+            d.ellipse((12, 12, 52, 52), fill=(255, 255, 255, 255))
+        except Exception:
+            pass
+        _TRAY_ICON_IMG = img
+    return _TRAY_ICON_IMG
+
+
+# 时间输入框格式：HH:MM:SS 或 MM:SS
+_TIME_RE = re.compile(r"\s*(?:(\d{1,2}):)?(\d{1,2}):(\d{1,2})\s*")
+
+# 视频播放后端的优先级：VLC 可硬件解码并直接渲染到原生窗口；OpenCV 在后台线程
+# 解码且可缓存帧；tkintervideo 逐帧在 Python 侧做 LANCZOS 缩放，仅作兜底
+_VIDEO_BACKENDS = ("vlc", "opencv", "tkintervideo")
+
+# 缩放后的视频帧总大小不超过该值时才缓存整段视频（约 64 MB）
+_FRAME_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 视频帧缩小到 1/k（k 为整数）后不小于画布适配尺寸的该比例时，按整数倍缩小
+_AREA_SNAP_MIN = 0.85
+
+# 预先格式化 0–3599 秒的 MM:SS 文本，倒计时每秒直接查表
+_MMSS_CACHE = [f"{i // 60:02d}:{i % 60:02d}" for i in range(3600)]
+
+
+DEFAULT_CONFIG = {
+    "use_seconds": 1500,  # 25min
+    "rest_seconds": 300,   # 5min
+    "popup_width": 600,
+    "popup_height": 400,
+    "video_path": "",
+    "auto_start_countdown": True,
+    "windows_autostart": False,
+    "enable_tray": True,
+    "enable_toast": True,
+    "fullscreen_rest": False,
+    "enable_lock_screen": False, # 新增
+}
+
+# 已解析配置的缓存，键为 (st_mtime_ns, st_size)，文件未变化时免去重复读取与解析
+_CFG_CACHE = {"stat": None, "data": None}
+
+
 def read_config():
-    if not os.path.exists(CONFIG_PATH):
-        return {
-            "use_seconds": 1500,  # 25min
-            "rest_seconds": 300,   # 5min
-            "popup_width": 600,
-            "popup_height": 400,
-            "video_path": "",
-            "auto_start_countdown": True,
-            "windows_autostart": False,
-            "enable_tray": True,
-            "enable_toast": True,
-            "fullscreen_rest": False,
-            "enable_lock_screen": False, # 新增
-        }
+    try:
+        st = os.stat(CONFIG_PATH)
+    except OSError:
+        return dict(DEFAULT_CONFIG)
+    key = (st.st_mtime_ns, st.st_size)
+    if _CFG_CACHE["stat"] == key:
+        return dict(_CFG_CACHE["data"])
     try:
         with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            cfg = json.load(f)
-            # 兼容旧配置，如果缺少新字段则添加
-            if "enable_lock_screen" not in cfg:
-                cfg["enable_lock_screen"] = False
-            return cfg
+            # 兼容旧配置，缺少的新字段使用默认值
+            cfg = {**DEFAULT_CONFIG, **json.load(f)}
     except Exception:
-        return {
-            "use_seconds": 1500,
-            "rest_seconds": 300,
-            "popup_width": 600,
-            "popup_height": 400,
-            "video_path": "",
-            "auto_start_countdown": True,
-            "windows_autostart": False,
-            "enable_tray": True,
-            "enable_toast": True,
-            "fullscreen_rest": False,
-            "enable_lock_screen": False, # 新增
-        }
+        return dict(DEFAULT_CONFIG)
+    _CFG_CACHE["stat"] = key
+    _CFG_CACHE["data"] = dict(cfg)
+    return cfg
 
 
 def write_config(cfg):
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, ensure_ascii=False, indent=2)
+    payload = json.dumps(cfg, ensure_ascii=False, indent=2).encode("utf-8")
+    # 内容未变化则跳过写入
+    try:
+        with open(CONFIG_PATH, "rb") as f:
+            if f.read() == payload:
+                return
+    except OSError:
+        pass
+    # 先写临时文件再原子替换，避免写到一半留下损坏的配置
+    tmp_path = CONFIG_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, CONFIG_PATH)
+    _CFG_CACHE["stat"] = None
+    _CFG_CACHE["data"] = None
+
+
+_AUTOSTART_RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+_AUTOSTART_APP_NAME = "CountdownApp"
+
+
+def _autostart_command() -> str:
+    python_exe = sys.executable
+    script_path = os.path.abspath(__file__)
+    # Use pythonw if available to avoid console window
+    if python_exe.endswith("python.exe") and os.path.exists(python_exe.replace("python.exe", "pythonw.exe")):
+        python_exe = python_exe.replace("python.exe", "pythonw.exe")
+    return f'"{python_exe}" "{script_path}"'
+
+
+def _read_autostart():
+    """Return the command currently registered under the Run key, or None."""
+    import winreg
+
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, _AUTOSTART_RUN_KEY, 0, winreg.KEY_READ) as key:
+            value, _ = winreg.QueryValueEx(key, _AUTOSTART_APP_NAME)
+            return value
+    except FileNotFoundError:
+        return None
 
 
 def set_windows_autostart(enable: bool):
@@ -148,20 +354,16 @@ def set_windows_autostart(enable: bool):
     try:
         import winreg
 
-        run_key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, run_key_path, 0, winreg.KEY_ALL_ACCESS) as key:
-            app_name = "CountdownApp"
+        intended_cmd = _autostart_command() if enable else None
+        # Registry already in the desired state: skip the write
+        if _read_autostart() == intended_cmd:
+            return True, None
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, _AUTOSTART_RUN_KEY, 0, winreg.KEY_SET_VALUE) as key:
             if enable:
-                python_exe = sys.executable
-                script_path = os.path.abspath(__file__)
-                # Use pythonw if available to avoid console window
-                if python_exe.endswith("python.exe") and os.path.exists(python_exe.replace("python.exe", "pythonw.exe")):
-                    python_exe = python_exe.replace("python.exe", "pythonw.exe")
-                cmd = f'"{python_exe}" "{script_path}"'
-                winreg.SetValueEx(key, app_name, 0, winreg.REG_SZ, cmd)
+                winreg.SetValueEx(key, _AUTOSTART_APP_NAME, 0, winreg.REG_SZ, intended_cmd)
             else:
                 try:
-                    winreg.DeleteValue(key, app_name)
+                    winreg.DeleteValue(key, _AUTOSTART_APP_NAME)
                 except FileNotFoundError:
                     pass
         return True, None
@@ -169,6 +371,180 @@ def set_windows_autostart(enable: bool):
         return False, str(e)
 
 
+# 未打包的脚本没有自己的 AppUserModelID，借用 PowerShell 的 ID 才能显示通知
+_TOAST_APP_ID = r"{1AC14E77-02E7-4E5D-B744-2EB1AE5198B7}\WindowsPowerShell\v1.0\powershell.exe"
+_TOAST_XML = (
+    '<toast><visual><binding template="ToastGeneric">'
+    "<text></text><text></text>"
+    "</binding></visual></toast>"
+)
+
+
+class _WinRTToaster:
+    """通过 WinRT ToastNotificationManager 直接推送通知，不创建线程和隐藏窗口。"""
+
+    def __init__(self):
+        self._notifier = ToastNotificationManager.create_toast_notifier(_TOAST_APP_ID)
+
+    def show(self, title, message):
+        # 通知会持有其 XmlDocument，因此每次新建；文本经 inner_text 写入，无需转义
+        doc = XmlDocument()
+        doc.load_xml(_TOAST_XML)
+        texts = doc.get_elements_by_tag_name("text")
+        texts.item(0).inner_text = title
+        texts.item(1).inner_text = message
+        self._notifier.show(ToastNotification(doc))
+
+
+class _Win10Toaster:
+    """win10toast 的包装，提供与 _WinRTToaster 相同的 show 接口。"""
+
+    def __init__(self):
+        self._toaster = ToastNotifier()
+
+    def show(self, title, message):
+        self._toaster.show_toast(title, message, duration=3, threaded=True)
+
+
+class _VideoWorker(threading.Thread):
+    """OpenCV 解码线程（生产者）：按源帧率读取、缩放帧，放入有界队列供 UI 线程贴图。
+
+    target_size 与 visible 由 UI 线程写入。完整解码一轮且未超出
+    _FRAME_CACHE_MAX_BYTES 时，通过 on_recorded(size, frames) 交出整段帧后退出；
+    is_cached(size) 为真时说明当前尺寸已有缓存，线程同样退出。
+    """
+
+    def __init__(self, video_path, cap, fps, frames, target_size, visible, on_recorded, is_cached):
+        super().__init__(daemon=True)
+        self.video_path = video_path
+        self.cap = cap  # None 时在线程内打开
+        self.frame_interval = 1.0 / fps
+        self.frames = frames
+        self.target_size = target_size
+        self.visible = threading.Event()
+        if visible:
+            self.visible.set()
+        self.on_recorded = on_recorded
+        self.is_cached = is_cached
+        self.stopped = False
+        self.failed = False  # 打开或读取失败，UI 不应反复重启
+        self._bufs = {}  # 复用的缩放 / RGB 缓冲区
+
+    def stop(self):
+        self.stopped = True
+        self.visible.set()  # 唤醒可能在等待的线程
+
+    def set_visible(self, visible):
+        if visible:
+            self.visible.set()
+        else:
+            self.visible.clear()
+
+    def _scale(self, frame, tw, th):
+        # 先等比缩小以适应画布（与 thumbnail 一致，不放大），再在较小的帧上转换为 RGB；
+        # 两步都写入复用的缓冲区，尺寸变化时才重新分配
+        bufs = self._bufs
+        fh, fw = frame.shape[:2]
+        scale = min(tw / fw, th / fh)
+        if scale < 1:
+            k = math.ceil(1 / scale)
+            if fw % k == 0 and fh % k == 0 and k * scale * _AREA_SNAP_MIN <= 1:
+                # 整数倍缩小时 INTER_AREA 走 OpenCV 的快速路径；只在损失不大时取整
+                fw, fh = fw // k, fh // k
+            else:
+                fw, fh = max(1, int(fw * scale)), max(1, int(fh * scale))
+            scaled = bufs.get("scaled")
+            if scaled is not None and scaled.shape[:2] != (fh, fw):
+                scaled = None
+            frame = bufs["scaled"] = cv2.resize(frame, (fw, fh), dst=scaled, interpolation=cv2.INTER_AREA)
+        rgb = bufs.get("rgb")
+        if rgb is not None and rgb.shape[:2] != (fh, fw):
+            rgb = None
+        rgb = bufs["rgb"] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        # tobytes() 复制一份，缓冲区可以安全复用
+        return Image.frombuffer("RGB", (fw, fh), rgb.tobytes(), "raw", "RGB", 0, 1)
+
+    def _push(self, img):
+        # 队列满时丢弃最旧的一帧，UI 总是显示最新帧
+        try:
+            self.frames.put_nowait(img)
+        except queue.Full:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put_nowait(img)
+
+    def run(self):
+        cap = self.cap
+        try:
+            if cap is None:
+                cap = _open_capture(self.video_path)
+                if not cap.isOpened():
+                    self.failed = True
+                    return
+            # 从第 0 帧开始录制一整轮，用于填充帧缓存
+            recording, rec_size, rec_bytes = [], None, 0
+            next_t = time.perf_counter()
+            while not self.stopped:
+                tw, th = self.target_size
+                if tw <= 1 or th <= 1 or not self.visible.is_set():
+                    # 画布尚未布局完成，或弹窗已隐藏
+                    self.visible.wait(0.1)
+                    next_t = time.perf_counter()
+                    continue
+                if self.is_cached((tw, th)):
+                    # 当前尺寸已有缓存，交给 UI 线程直接播放
+                    return
+                ret, frame = cap.read()
+                if not ret:
+                    if recording:
+                        # 完整录完一轮：交出整段帧后退出
+                        self.on_recorded(rec_size, recording)
+                        return
+                    # 视频结束，重置并循环
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    ret, frame = cap.read()
+                    if not ret:
+                        self.failed = True
+                        return
+                    if rec_bytes <= _FRAME_CACHE_MAX_BYTES:
+                        recording, rec_size, rec_bytes = [], None, 0
+
+                img = self._scale(frame, tw, th)
+
+                if recording is not None:
+                    if rec_size is None:
+                        rec_size = (tw, th)
+                    rec_bytes += img.width * img.height * 3
+                    if rec_size != (tw, th) or rec_bytes > _FRAME_CACHE_MAX_BYTES:
+                        # 中途改变尺寸或视频太长：本轮放弃缓存
+                        recording = None
+                    else:
+                        recording.append(img)
+
+                self._push(img)
+
+                # 以绝对时间点推进，避免 sleep 误差累积
+                next_t += self.frame_interval
+                dt = next_t - time.perf_counter()
+                if dt > 0:
+                    time.sleep(dt)
+                else:
+                    # 解码跟不上时从当前时刻重新计时
+                    next_t = time.perf_counter()
+        except Exception:
+            self.failed = True
+        finally:
+            self.stopped = True
+            # 在解码线程内释放，避免与正在进行的 read() 竞争
+            if cap is not None:
+                try:
+                    cap.release()
+                except Exception:
+                    pass
+
+
 class CountdownState:
     IDLE = "idle"
     RUNNING = "running"
@@ -182,6 +558,13 @@ class Phase:
 
 
 class App(tk.Tk):
+    # 暂停按钮的 (text, state) 组合
+    _BTN_PAUSE_NORMAL = ("暂停", tk.NORMAL)
+    _BTN_PAUSE_IDLE = ("暂停", tk.DISABLED)
+    _BTN_PAUSE_RESUME = ("继续", tk.NORMAL)
+    _BTN_PAUSE_LOCKED = ("继续 (已锁屏)", tk.DISABLED)
+    _BTN_PAUSE_LOCKED_RUNNING = ("暂停 (已锁屏)", tk.DISABLED)
+
     def __init__(self):
         super().__init__()
         self.title("护眼倒计时")
@@ -189,22 +572,34 @@ class App(tk.Tk):
         self.resizable(False, False)
 
         self.config_data = read_config()
+        self._refresh_cached_config()
 
         # Internal state
         self.current_phase = Phase.USE
-        self.remaining_seconds = int(self.config_data.get("use_seconds", 1500))
+        self.remaining_seconds = self._use_seconds
         self.state = CountdownState.IDLE
-        self._ticker = None
+        self._ticker = None  # pending `after` id of _tick
+        self._deadline = 0.0  # time.monotonic() at which the current phase ends
+        self._paused_remaining = None  # 暂停时的精确剩余秒数（含小数），见 _pause_ticker
+        self._session_locked = False  # 屏幕是否已锁定（由 WTS 会话通知维护）
+        self._lock_requested = False  # 锁屏是否由本程序在进入休息时发起
         self._tray_icon = None
-        self._toaster = ToastNotifier() if (os.name == "nt" and TOAST_AVAILABLE) else None
-        self._screen_locked_check_id = None # For Windows screen lock status check
+        self._tray_menu = None  # pystray.Menu，首次启动托盘时创建，见 _build_tray_menu
+        self._video_dim_cache = {}  # (video_path, mtime_ns) -> (width, height)
+        self._popup = None  # reused reminder Toplevel, see _ensure_popup
+        # (video_path, mtime_ns) -> {"size", "frames", "fps"}，见 _play_video_with_opencv
+        self._video_frame_cache = {}
+        self._toaster = None  # created lazily by the `toaster` property
+        self._toaster_checked = False
+        self._last_label_text = {}  # widget -> last (text, ...) written, see _set_label_text
+        self._ui_visible = True  # 主窗口是否显示；最小化到托盘时不刷新标签
 
         self._build_ui()
         self._apply_config_to_ui()
 
         # Tray
         self.protocol("WM_DELETE_WINDOW", self._on_window_close)
-        if self.config_data.get("enable_tray", True):
+        if self._enable_tray:
             self.after(200, self._start_tray)
 
         # Autostart countdown on launch
@@ -218,59 +613,116 @@ class App(tk.Tk):
                 messagebox.showwarning("开机自启失败", f"设置开机自启时出现问题: {err}")
 
         # Register for Windows Session Notifications (for screen lock/unlock)
-        if WINDOWS_SCREEN_STATUS_AVAILABLE:
-            self.hwnd = None
-            try:
-                self.hwnd = win32gui.CreateWindow(
-                    win32gui.RegisterClass(win32gui.WNDCLASS()),
-                    "CountimeHiddenWindow",
-                    0,
-                    0, 0, 0, 0,
-                    0, 0,
-                    win32gui.GetModuleHandle(None),
-                    None
-                )
-                win32gui.SetWindowLong(self.hwnd, win32con.GWL_WNDPROC, self._wnd_proc)
-                win32gui.RegisterSessionNotification(self.hwnd, win32con.NOTIFY_FOR_ALL_SESSIONS)
-                print("Windows session notifications registered.")
-            except Exception as e:
-                print(f"Failed to register Windows session notifications: {e}")
-                self.hwnd = None # Ensure it's None if registration fails
+        self.hwnd = None
+        self._register_session_notifications()
+
+    def _register_session_notifications(self):
+        """用 ctypes 创建仅消息窗口并订阅 WTS 会话通知（锁屏/解锁），仅 Windows。
+
+        锁屏检测完全由系统推送的 WM_WTSSESSION_CHANGE 事件驱动，不做轮询；
+        macOS / Linux 上直接跳过，不检测锁屏状态。
+        """
+        if not (sys.platform.startswith("win") and WINDOWS_LOCK_AVAILABLE):
+            return
+        try:
+            from ctypes import wintypes
+
+            # 使用独立的 DLL 实例，避免修改全局 ctypes.windll 函数的 argtypes
+            user32 = ctypes.WinDLL("user32", use_last_error=True)
+            wtsapi32 = ctypes.WinDLL("wtsapi32", use_last_error=True)
+            LRESULT = ctypes.c_ssize_t
+            WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+            # 32 位 Python 中没有 SetWindowLongPtrW
+            set_window_long = getattr(user32, "SetWindowLongPtrW", None) or user32.SetWindowLongW
+
+            user32.CreateWindowExW.restype = wintypes.HWND
+            user32.CreateWindowExW.argtypes = [
+                wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+                ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID,
+            ]
+            set_window_long.restype = ctypes.c_void_p
+            set_window_long.argtypes = [wintypes.HWND, ctypes.c_int, ctypes.c_void_p]
+            user32.CallWindowProcW.restype = LRESULT
+            user32.CallWindowProcW.argtypes = [ctypes.c_void_p, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+            user32.DestroyWindow.argtypes = [wintypes.HWND]
+            wtsapi32.WTSRegisterSessionNotification.argtypes = [wintypes.HWND, wintypes.DWORD]
+            wtsapi32.WTSUnRegisterSessionNotification.argtypes = [wintypes.HWND]
+
+            # 系统内置的 STATIC 窗口类无需注册；HWND_MESSAGE 父窗口使其成为不可见的仅消息窗口
+            hwnd = user32.CreateWindowExW(
+                0, "STATIC", "CountimeHiddenWindow", 0,
+                0, 0, 0, 0,
+                HWND_MESSAGE, None, None, None,
+            )
+            if not hwnd:
+                raise ctypes.WinError(ctypes.get_last_error())
+            self._user32 = user32
+            self._wtsapi32 = wtsapi32
+            self.hwnd = hwnd
+            self._wndproc_ref = WNDPROC(self._wnd_proc)  # 保持引用，防止回调被回收
+            self._orig_wndproc = set_window_long(hwnd, GWLP_WNDPROC, ctypes.cast(self._wndproc_ref, ctypes.c_void_p))
+            if not wtsapi32.WTSRegisterSessionNotification(hwnd, NOTIFY_FOR_ALL_SESSIONS):
+                raise ctypes.WinError(ctypes.get_last_error())
+            log.debug("Windows session notifications registered.")
+        except Exception as e:
+            log.warning("Failed to register Windows session notifications: %s", e)
+            if self.hwnd:
+                try:
+                    self._user32.DestroyWindow(self.hwnd)
+                except Exception:
+                    pass
+            self.hwnd = None # Ensure it's None if registration fails
 
     def _wnd_proc(self, hwnd, msg, wparam, lparam):
-        if msg == win32con.WM_WTSSESSION_CHANGE:
-            if wparam == win32con.WTS_SESSION_LOCK:
+        if msg == WM_WTSSESSION_CHANGE:
+            if wparam == WTS_SESSION_LOCK:
                 self.after(0, self._on_screen_lock)
-            elif wparam == win32con.WTS_SESSION_UNLOCK:
+            elif wparam == WTS_SESSION_UNLOCK:
                 self.after(0, self._on_screen_unlock)
-        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+        return self._user32.CallWindowProcW(self._orig_wndproc, hwnd, msg, wparam, lparam)
 
     def _on_screen_lock(self):
-        print("Screen locked event detected.")
+        log.debug("Screen locked event detected.")
+        self._session_locked = True
+        if self._lock_requested:
+            # 进入休息时由本程序锁屏：休息在后台继续计时，锁屏期间只在截止时刻唤醒一次
+            self._lock_requested = False
+            if self.state == CountdownState.RUNNING:
+                self._cancel_ticker()
+                self._tick()
+            return
         if self.current_phase == Phase.REST and self.state == CountdownState.RUNNING:
             self.state = CountdownState.LOCKED_PAUSED
-            print("Countdown paused due to screen lock during rest phase.")
+            self._pause_ticker()
+            log.debug("Countdown paused due to screen lock during rest phase.")
             self._update_labels() # Update UI to reflect paused state
-            self.pause_btn.config(text="继续 (已锁屏)", state=tk.DISABLED) # Update button text
+            self._set_pause_btn(self._BTN_PAUSE_LOCKED) # Update button text
             self.start_btn.config(state=tk.DISABLED)
 
     def _on_screen_unlock(self):
-        print("Screen unlocked event detected.")
-        if self.current_phase == Phase.USE and self.state == CountdownState.LOCKED_PAUSED:
+        log.debug("Screen unlocked event detected.")
+        self._session_locked = False
+        self._lock_requested = False
+        if self.state == CountdownState.RUNNING:
+            # 从截止时刻重新计算剩余时间，恢复每秒刷新界面
+            self._cancel_ticker()
+            self._tick()
+            if self.pause_btn["text"] == self._BTN_PAUSE_LOCKED_RUNNING[0]:
+                self._set_pause_btn(self._BTN_PAUSE_NORMAL)
+        elif self.current_phase == Phase.USE and self.state == CountdownState.LOCKED_PAUSED:
             # This condition is for when the rest phase *just* ended, but use phase couldn't start because of lock.
             # Now unlocked, start the use phase countdown.
-            print("Screen unlocked, resuming use phase countdown.")
-            self.state = CountdownState.RUNNING
+            log.debug("Screen unlocked, resuming use phase countdown.")
             self.start_countdown()
         elif self.current_phase == Phase.REST and self.state == CountdownState.LOCKED_PAUSED:
             # If screen was locked during rest, and is now unlocked, resume rest countdown
-            print("Screen unlocked, resuming rest phase countdown.")
-            self.state = CountdownState.RUNNING
+            log.debug("Screen unlocked, resuming rest phase countdown.")
             self.start_countdown()
         
         # In any case of unlock, if we were showing a special "paused due to lock" status, clear it
-        if self.pause_btn["text"] == "继续 (已锁屏)":
-            self.pause_btn.config(text="暂停", state=tk.NORMAL)
+        if self.pause_btn["text"] == self._BTN_PAUSE_LOCKED[0]:
+            self._set_pause_btn(self._BTN_PAUSE_NORMAL)
         
         self._update_labels()
 
@@ -342,14 +794,12 @@ class App(tk.Tk):
         ttk.Separator(container, orient=tk.HORIZONTAL).grid(row=6, column=0, columnspan=4, sticky="we", pady=12)
 
         # Countdown display
-        self.phase_var = tk.StringVar(value=f"当前阶段：{self.current_phase}")
-        self.time_var = tk.StringVar(value=self._format_seconds(self.remaining_seconds))
-        self.phase_label = ttk.Label(container, textvariable=self.phase_var, font=("Microsoft YaHei", 12))
+        # 直接设置 text 而不绑定 StringVar，每秒更新时省去 Tcl 变量写入与 trace
+        self.phase_label = ttk.Label(container, font=("Microsoft YaHei", 12))
         
         # 数字时钟样式：粗体、深灰色、现代字体
         self.time_label = ttk.Label(
             container, 
-            textvariable=self.time_var, 
             font=("Segoe UI", 48, "bold"),
             foreground="#343a40"  # 深灰色，类似图片中的颜色
         )
@@ -373,31 +823,40 @@ class App(tk.Tk):
         footer = ttk.Label(container, text="倒计时分为两段：使用时间 → 弹窗/锁屏 + 休息时间 → 循环。", foreground="#666")
         footer.grid(row=9, column=0, columnspan=4, sticky="w", pady=(12, 0))
 
+    def _refresh_cached_config(self):
+        """将常用配置项解析为属性，避免计时与阶段切换时反复查字典。"""
+        cfg = self.config_data
+        self._use_seconds = int(cfg.get("use_seconds", 1500))
+        self._rest_seconds = int(cfg.get("rest_seconds", 300))
+        self._popup_w = int(cfg.get("popup_width", 600))
+        self._popup_h = int(cfg.get("popup_height", 400))
+        self._enable_lock = bool(cfg.get("enable_lock_screen", False))
+        self._enable_toast = bool(cfg.get("enable_toast", True))
+        self._enable_tray = bool(cfg.get("enable_tray", True))
+        self._fullscreen_rest = bool(cfg.get("fullscreen_rest", False))
+        self._video_path = cfg.get("video_path", "")
+
     def _apply_config_to_ui(self):
         # 从配置读取秒数
-        use_sec = max(1, int(self.config_data.get("use_seconds", 1500)))
-        rest_sec = max(1, int(self.config_data.get("rest_seconds", 300)))
+        use_sec = max(1, self._use_seconds)
+        rest_sec = max(1, self._rest_seconds)
         
-        # 初始化秒数变量（用于保存设置）
-        self.use_seconds_var = tk.IntVar(value=use_sec)
-        self.rest_seconds_var = tk.IntVar(value=rest_sec)
+        # 写入选择器的总秒数变量（输入框显示随之刷新）
+        self.use_seconds_var.set(use_sec)
+        self.rest_seconds_var.set(rest_sec)
         
-        # 兼容性：保留分钟变量（默认值基于秒数）
-        self.use_minutes_var = tk.IntVar(value=use_sec // 60)
-        self.rest_minutes_var = tk.IntVar(value=rest_sec // 60)
-        
-        self.popup_w_var.set(int(self.config_data.get("popup_width", 600)))
-        self.popup_h_var.set(int(self.config_data.get("popup_height", 400)))
-        self.video_path_var.set(self.config_data.get("video_path", ""))
+        self.popup_w_var.set(self._popup_w)
+        self.popup_h_var.set(self._popup_h)
+        self.video_path_var.set(self._video_path)
         self.auto_start_var.set(bool(self.config_data.get("auto_start_countdown", True)))
         self.win_autostart_var.set(bool(self.config_data.get("windows_autostart", False)))
-        self.tray_var.set(bool(self.config_data.get("enable_tray", True)))
+        self.tray_var.set(self._enable_tray)
         # self.toast_var.set(bool(self.config_data.get("enable_toast", True)))
         # self.fullscreen_rest_var.set(bool(self.config_data.get("fullscreen_rest", False)))
-        self.lock_screen_var.set(bool(self.config_data.get("enable_lock_screen", False))) # 新增
+        self.lock_screen_var.set(self._enable_lock) # 新增
 
         self.current_phase = Phase.USE
-        self.remaining_seconds = int(self.config_data.get("use_seconds", 1500))
+        self.remaining_seconds = self._use_seconds
         self._update_labels()
 
     def _choose_video(self):
@@ -409,24 +868,13 @@ class App(tk.Tk):
             self.video_path_var.set(path)
 
     def _create_time_selector(self, parent, prefix, default_minutes):
-        """创建可编辑 HH:MM:SS 时间选择器（精确到秒）"""
-        # 将分钟转换为总秒数
-        default_seconds = default_minutes * 60
-        
-        # 从秒数计算小时、分钟、秒
-        total_seconds = default_seconds
-        hours = total_seconds // 3600
-        minutes = (total_seconds // 60) % 60
-        seconds = total_seconds % 60
-        
-        # 存储变量
-        setattr(self, f"{prefix}_hours_var", tk.IntVar(value=hours))
-        setattr(self, f"{prefix}_minutes_var", tk.IntVar(value=minutes))
-        setattr(self, f"{prefix}_seconds_var", tk.IntVar(value=seconds))
-        
-        hours_var = getattr(self, f"{prefix}_hours_var")
-        minutes_var = getattr(self, f"{prefix}_minutes_var")
-        seconds_var = getattr(self, f"{prefix}_seconds_var")
+        """创建可编辑 HH:MM:SS 时间选择器（精确到秒）
+
+        每个选择器只有一个 IntVar（self.<prefix>_seconds_var）保存总秒数，
+        输入框显示通过 trace 自动跟随该变量刷新。
+        """
+        seconds_var = tk.IntVar(value=default_minutes * 60)
+        setattr(self, f"{prefix}_seconds_var", seconds_var)
         
         # 可编辑的 HH:MM:SS 显示与输入
         time_entry_var = tk.StringVar(value="00:00:00")
@@ -434,42 +882,26 @@ class App(tk.Tk):
         time_entry.grid(row=0, column=0, columnspan=5, pady=(0, 8))
         
         # 更新显示的函数
-        def update_display():
-            h = hours_var.get()
-            m = minutes_var.get()
-            s = seconds_var.get()
+        def update_display(*_):
+            h, rest = divmod(max(0, seconds_var.get()), 3600)
+            m, s = divmod(rest, 60)
             time_entry_var.set(f"{h:02d}:{m:02d}:{s:02d}")
-            # 更新对应的总秒数变量
-            total_seconds = h * 3600 + m * 60 + s
-            if prefix == "use":
-                # Ensure the attribute is set directly, not just a local variable
-                self.use_seconds_var.set(total_seconds)
-            else:
-                self.rest_seconds_var.set(total_seconds)
 
         def parse_and_apply_entry():
-            """从输入框解析 HH:MM:SS 并同步到各变量。"""
-            text = time_entry_var.get().strip()
-            try:
-                parts = text.split(":")
-                if len(parts) == 3:
-                    ph, pm, ps = parts
-                elif len(parts) == 2:
-                    # 允许 MM:SS
-                    ph, pm, ps = "0", parts[0], parts[1]
-                else:
-                    raise ValueError
-                h = max(0, min(23, int(ph)))
-                m = max(0, min(59, int(pm)))
-                s = max(0, min(59, int(ps)))
-                hours_var.set(h)
-                minutes_var.set(m)
-                seconds_var.set(s)
-                update_display()
-            except Exception:
+            """从输入框解析 HH:MM:SS 并写回总秒数。"""
+            match = _TIME_RE.fullmatch(time_entry_var.get())
+            if match:
+                # 允许 MM:SS，省略的小时按 0 处理
+                h = min(23, int(match.group(1) or 0))
+                m = min(59, int(match.group(2)))
+                s = min(59, int(match.group(3)))
+                seconds_var.set(h * 3600 + m * 60 + s)  # trace 会刷新显示
+            else:
                 # 解析失败则回显为当前有效值
                 update_display()
         
+        seconds_var.trace_add("write", update_display)
+
         # 输入框事件绑定
         time_entry.bind("<FocusOut>", lambda e: parse_and_apply_entry())
         time_entry.bind("<Return>", lambda e: parse_and_apply_entry())
@@ -478,84 +910,231 @@ class App(tk.Tk):
         # 初始显示
         update_display()
     
-    def _play_video_with_opencv(self, canvas, video_path, popup):
-        """使用 OpenCV 播放视频"""
-        # import cv2  # Already imported
-        from PIL import Image, ImageTk
+    def _play_video_with_vlc(self, frame, video_path, popup):
+        """使用 VLC 播放视频：硬件解码，直接渲染到原生窗口"""
+        container = tk.Frame(frame, bg="#000")
+        container.pack(fill=tk.BOTH, expand=True)
+        instance = player = bid = None
+
+        # 容器映射（真正显示）后再把原生窗口交给 VLC 并开始播放，
+        # 无需 update_idletasks() 强制刷新整个弹窗的布局
+        def _start_vlc(_event):
+            container.unbind("<Map>", bid)
+            try:
+                hwnd = container.winfo_id()
+                if sys.platform.startswith("win"):
+                    player.set_hwnd(hwnd)
+                elif sys.platform == "darwin":
+                    player.set_nsobject(hwnd)
+                else:
+                    player.set_xwindow(hwnd)
+                if player.play() == -1:
+                    raise RuntimeError("无法开始播放")
+            except Exception as e:
+                # 此时已不在后端选择循环中，只能就地释放并提示错误
+                log.warning("VLC playback failed: %s", e)
+                _cleanup_vlc()
+                container.destroy()
+                ttk.Label(frame, text=f"VLC 播放失败: {e}").pack(expand=True)
+
+        # 在 try 之外定义：创建中途失败时同样用它释放已创建的对象；可重复调用
+        def _cleanup_vlc():
+            nonlocal instance, player
+            try:
+                if player is not None:
+                    player.stop()
+                    player.release()
+                if instance is not None:
+                    instance.release()
+            except Exception:
+                pass
+            instance = player = None
+
+        try:
+            instance = vlc.Instance("--avcodec-hw=any")
+            player = instance.media_player_new()
+            player.set_media(instance.media_new(video_path))
+            bid = container.bind("<Map>", _start_vlc)
+        except Exception:
+            _cleanup_vlc()
+            container.destroy()
+            raise
+        popup._video_cleanup.append(_cleanup_vlc)
+
+    def _play_video_with_tkintervideo(self, frame, video_path, popup):
+        """使用 tkintervideo 播放视频（最后的备选：逐帧在 Python 侧缩放）"""
+        tk_player = TkinterVideo(master=frame, scaled=True, keep_aspect=True, bg="#000")
+        try:
+            tk_player.pack(fill=tk.BOTH, expand=True)
+            # 若支持，改用最近邻缩放，跳过逐帧 LANCZOS
+            if _try_import_pil() and hasattr(tk_player, "set_resampling_method"):
+                tk_player.set_resampling_method(Image.NEAREST)
+            tk_player.load(video_path)
+            tk_player.play()
+        except Exception:
+            try:
+                tk_player.destroy()
+            except Exception:
+                pass
+            raise
+        def _cleanup_tk():
+            try:
+                tk_player.stop()
+            except Exception:
+                pass
+        popup._video_cleanup.append(_cleanup_tk)
+
+    def _play_video_with_opencv(self, canvas, video_path, popup, cap=None):
+        """使用 OpenCV 播放视频：后台线程解码并缩放，UI 线程只负责贴图
+
+        cap 为已打开的 VideoCapture 时直接复用，函数负责释放它。
+        较短的视频在第一轮播放时会把缩放后的帧缓存到 self._video_frame_cache，
+        之后同尺寸的弹窗直接循环播放缓存帧，不再解码。
+        """
+        # cv2 已由调用方通过 _try_import_cv2() 导入
+        from PIL import ImageTk
         
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise Exception("无法打开视频文件")
+        key = (video_path, os.stat(video_path).st_mtime_ns)
+        cached = self._video_frame_cache.get(key)
+        if cached is not None:
+            # 已有解码缓存，通常无需打开视频；尺寸不符时再由解码线程打开
+            if cap is not None:
+                cap.release()
+                cap = None
+            fps = cached["fps"]
+        else:
+            if cap is None:
+                cap = _open_capture(video_path)
+            if not cap.isOpened():
+                cap.release()
+                raise Exception("无法打开视频文件")
+            # 按视频自身帧率解码；部分容器读不到帧率时按 30 FPS 处理
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            if not 1 <= fps <= 240:
+                fps = 30.0
         
         # 存储变量
         popup._playing = True
-        popup._cap = cap
-        
+        popup._visible = True  # 之后由弹窗的 <Map>/<Unmap> 更新，见 _ensure_popup
+        popup._target_w = 0
+        popup._target_h = 0
+        popup._photo = None  # 复用的 PhotoImage，仅在帧尺寸变化时重建
+        popup._worker = None  # 当前的 _VideoWorker 解码线程
+        popup._cache_pos = 0  # 播放缓存帧时的下标
+        frames = queue.Queue(maxsize=2)  # 有界队列，限制内存占用
+        ui_interval_ms = max(10, int(1000 / fps))
+
+        def on_configure(event):
+            popup._target_w = event.width
+            popup._target_h = event.height
+            if popup._worker is not None:
+                popup._worker.target_size = (event.width, event.height)
+            # 居中显示
+            canvas.coords("vid", event.width // 2, event.height // 2)
+
+        canvas.bind("<Configure>", on_configure)
+
+        def cached_frames(size):
+            entry = self._video_frame_cache.get(key)
+            if entry is not None and entry["size"] == size:
+                return entry["frames"]
+            return None
+
+        def on_recorded(size, recorded):
+            # 在解码线程中调用；只保留一个视频的帧缓存
+            self._video_frame_cache.clear()
+            self._video_frame_cache[key] = {"size": size, "frames": recorded, "fps": fps}
+
+        def start_worker(cap=None):
+            popup._worker = _VideoWorker(
+                video_path, cap, fps, frames,
+                (popup._target_w, popup._target_h), popup._visible,
+                on_recorded, lambda size: cached_frames(size) is not None,
+            )
+            popup._worker.start()
+
         def update_frame():
             if not popup._playing:
                 return
-            try:
-                ret, frame = cap.read()
-                if not ret:
-                    # 视频结束，重置并循环
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret, frame = cap.read()
-                    if not ret:
-                        return
-                
-                # 转换为 RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # 调整尺寸以适应画布
-                canvas_width = canvas.winfo_width()
-                canvas_height = canvas.winfo_height()
-                if canvas_width > 1 and canvas_height > 1:
-                    img = Image.fromarray(frame_rgb)
-                    img.thumbnail((canvas_width, canvas_height), Image.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
-                    
-                    # 居中显示
-                    canvas.delete("all")
-                    x = canvas_width // 2
-                    y = canvas_height // 2
-                    canvas.create_image(x, y, anchor=tk.CENTER, image=photo)
-                    canvas._photo = photo  # 保持引用
-            except Exception:
-                pass
+            img = None
+            size = (popup._target_w, popup._target_h)
+            cached = cached_frames(size)
+            if not popup._visible:
+                pass  # 弹窗已隐藏，不取帧
+            elif cached:
+                # 命中缓存：直接取下一帧，无需解码
+                img = cached[popup._cache_pos % len(cached)]
+                popup._cache_pos += 1
+            else:
+                worker = popup._worker
+                if size[0] > 1 and size[1] > 1 and (worker is None or (worker.stopped and not worker.failed)):
+                    # 没有可用缓存（首次播放或尺寸变化）：启动解码线程
+                    start_worker()
+                # 取出队列中最新的一帧
+                while True:
+                    try:
+                        img = frames.get_nowait()
+                    except queue.Empty:
+                        break
+            if img is not None:
+                try:
+                    photo = popup._photo
+                    if photo is not None and (photo.width(), photo.height()) == img.size:
+                        # 原地更新像素，Tk 会自动重绘
+                        photo.paste(img)
+                    else:
+                        popup._photo = ImageTk.PhotoImage(img)  # 同时保持引用
+                        canvas.delete("vid")
+                        x = popup._target_w // 2
+                        y = popup._target_h // 2
+                        canvas.create_image(x, y, anchor=tk.CENTER, image=popup._photo, tags="vid")
+                except Exception:
+                    pass
             
             if popup._playing:
-                canvas.after(33, update_frame)  # ~30 FPS
+                canvas.after(ui_interval_ms, update_frame)
         
         def cleanup():
             popup._playing = False
-            try:
-                cap.release()
-            except Exception:
-                pass
+            if popup._worker is not None:
+                popup._worker.stop()
         
         popup._video_cleanup.append(cleanup)
+        if cap is not None:
+            start_worker(cap)
         update_frame()
 
     def _format_seconds(self, sec: int) -> str:
         if sec < 0:
             sec = 0
+        if sec < 3600:
+            return _MMSS_CACHE[sec]
         m, s = divmod(sec, 60)
         h, m = divmod(m, 60)
-        if h:
-            return f"{h:02d}:{m:02d}:{s:02d}"
-        return f"{m:02d}:{s:02d}"
+        return f"{h:02d}:{m:02d}:{s:02d}"
 
     def _update_labels(self):
-        self.phase_var.set(f"当前阶段：{self.current_phase}")
-        self.time_var.set(self._format_seconds(self.remaining_seconds))
+        if not self._ui_visible:
+            return  # 窗口已隐藏到托盘，重新显示时由 deiconify 补刷
+        phase_text = f"当前阶段：{self.current_phase}"
         if self.state == CountdownState.LOCKED_PAUSED:
-            self.phase_var.set(f"当前阶段：{self.current_phase} (已锁屏)")
-            self.time_var.set(self._format_seconds(self.remaining_seconds)) # Still show time, but indicate paused
+            phase_text += " (已锁屏)"
+        time_text = self._format_seconds(self.remaining_seconds) # Still show time when paused
+        self._set_label_text(self.phase_label, phase_text)
+        self._set_label_text(self.time_label, time_text)
+
+    def _set_label_text(self, widget, text, **options):
+        """仅在文本（或其他选项）变化时 configure 控件，避免无谓的重绘。"""
+        value = (text, *options.values())
+        if self._last_label_text.get(widget) == value:
+            return
+        self._last_label_text[widget] = value
+        widget.configure(text=text, **options)
 
     def save_settings(self):
         # 从秒数变量获取值
-        use_seconds = int(getattr(self, "use_seconds_var", tk.IntVar(value=1500)).get())
-        rest_seconds = int(getattr(self, "rest_seconds_var", tk.IntVar(value=300)).get())
+        use_seconds = int(self.use_seconds_var.get())
+        rest_seconds = int(self.rest_seconds_var.get())
         
         cfg = {
             "use_seconds": use_seconds,
@@ -572,6 +1151,7 @@ class App(tk.Tk):
         }
         write_config(cfg)
         self.config_data = cfg
+        self._refresh_cached_config()
         ok, err = (True, None)
         if os.name == "nt":
             ok, err = set_windows_autostart(cfg.get("windows_autostart", False))
@@ -588,46 +1168,94 @@ class App(tk.Tk):
             return
         # Ensure remaining time is set for current phase
         if self.current_phase == Phase.USE:
-            self.remaining_seconds = int(self.config_data.get("use_seconds", 1500)) if self.remaining_seconds <= 0 else self.remaining_seconds
+            self.remaining_seconds = self._use_seconds if self.remaining_seconds <= 0 else self.remaining_seconds
         else: # Phase.REST
-            self.remaining_seconds = int(self.config_data.get("rest_seconds", 300)) if self.remaining_seconds <= 0 else self.remaining_seconds
+            self.remaining_seconds = self._rest_seconds if self.remaining_seconds <= 0 else self.remaining_seconds
             
         self.state = CountdownState.RUNNING
         self.start_btn.config(state=tk.DISABLED)
-        self.pause_btn.config(state=tk.NORMAL, text="暂停")
-        self._tick()
+        self._set_pause_btn(self._BTN_PAUSE_NORMAL)
+        self._start_ticker()
+
+    def _set_pause_btn(self, spec):
+        text, state = spec
+        self._set_label_text(self.pause_btn, text, state=state)
 
     def toggle_pause(self):
         if self.state == CountdownState.RUNNING:
             self.state = CountdownState.PAUSED
-            self.pause_btn.config(text="继续")
+            self._pause_ticker()
+            self._set_pause_btn(self._BTN_PAUSE_RESUME)
         elif self.state == CountdownState.PAUSED:
             self.state = CountdownState.RUNNING
-            self.pause_btn.config(text="暂停")
-            self._tick()
+            self._set_pause_btn(self._BTN_PAUSE_NORMAL)
+            self._start_ticker()
 
     def reset_countdown(self):
         self.state = CountdownState.IDLE
+        self._cancel_ticker()
+        self._lock_requested = False
         self.current_phase = Phase.USE
-        self.remaining_seconds = int(self.config_data.get("use_seconds", 1500))
+        self.remaining_seconds = self._use_seconds
         self._update_labels()
         self.start_btn.config(state=tk.NORMAL)
-        self.pause_btn.config(state=tk.DISABLED, text="暂停")
+        self._set_pause_btn(self._BTN_PAUSE_IDLE)
+
+    def _start_ticker(self):
+        """从 remaining_seconds 计算本阶段的截止时刻并开始计时。"""
+        self._cancel_ticker()
+        remaining = self.remaining_seconds
+        exact = self._paused_remaining
+        self._paused_remaining = None
+        # 从暂停恢复时沿用暂停前的小数部分，避免每次暂停都多出最多 1 秒
+        if exact is not None and math.ceil(exact) == remaining:
+            remaining = exact
+        self._deadline = time.monotonic() + remaining
+        self._update_labels()
+        self._tick()
+
+    def _pause_ticker(self):
+        """停止计时并记下距截止时刻的精确剩余时间，供 _start_ticker 恢复。"""
+        self._cancel_ticker()
+        self._paused_remaining = max(0.0, self._deadline - time.monotonic())
+
+    def _cancel_ticker(self):
+        if self._ticker is not None:
+            try:
+                self.after_cancel(self._ticker)
+            except Exception:
+                pass
+            self._ticker = None
 
     def _tick(self):
+        self._ticker = None
         if self.state != CountdownState.RUNNING:
             return
-        self._update_labels()
-        if self.remaining_seconds <= 0:
+        # Remaining time is derived from a monotonic deadline, so late `after`
+        # callbacks never accumulate drift.
+        delta = self._deadline - time.monotonic()
+        if delta <= 0:
             # Phase complete → popup
+            self._lock_requested = False
+            self.remaining_seconds = 0
+            self._update_labels()
             self.state = CountdownState.IDLE # Temporarily set to IDLE
             self.start_btn.config(state=tk.NORMAL)
-            self.pause_btn.config(state=tk.DISABLED, text="暂停")
+            self._set_pause_btn(self._BTN_PAUSE_IDLE)
             self._notify_phase_complete()
             self._show_media_popup_and_continue()
             return
-        self.remaining_seconds -= 1
-        self.after(1000, self._tick)
+        remaining = math.ceil(delta)
+        if self._session_locked:
+            # 锁屏时界面不可见：不刷新标签，直接睡到截止时刻
+            self.remaining_seconds = remaining
+            self._ticker = self.after(int(delta * 1000) + 1, self._tick)
+            return
+        if remaining != self.remaining_seconds:
+            self.remaining_seconds = remaining
+            self._update_labels()
+        # Wake up just past the next whole-second boundary
+        self._ticker = self.after(int((delta % 1) * 1000) + 1, self._tick)
 
     # --- NEW LOCK COMPUTER METHOD ---
     def _lock_computer(self):
@@ -637,10 +1265,14 @@ class App(tk.Tk):
         if sys.platform.startswith("win"):
             if WINDOWS_LOCK_AVAILABLE:
                 try:
-                    ctypes.windll.user32.LockWorkStation()
-                    print("Windows: Computer locked.")
+                    # 失败时返回 0 而不抛异常（例如组策略禁用了锁屏）
+                    if not ctypes.windll.user32.LockWorkStation():
+                        raise ctypes.WinError()
+                    # 仅在锁屏请求成功后标记，随后的锁屏事件才视为本程序发起
+                    self._lock_requested = True
+                    log.debug("Windows: Computer locked.")
                 except Exception as e:
-                    print(f"Error locking Windows: {e}")
+                    log.warning("Error locking Windows: %s", e)
                     messagebox.showerror("锁屏失败", f"无法锁定Windows电脑: {e}")
             else:
                 messagebox.showwarning("锁屏功能不可用", "ctypes库在Windows上加载失败，无法使用锁屏功能。")
@@ -650,9 +1282,9 @@ class App(tk.Tk):
                 # It's the closest to "locking" the screen programmatically on macOS.
                 # The 'keystroke' command simulates Ctrl+Cmd+Q, which locks the screen on modern macOS.
                 subprocess.run(["osascript", "-e", 'tell application "System Events" to keystroke "q" using {control down, command down}'])
-                print("macOS: Screen locked (screensaver activated).")
+                log.debug("macOS: Screen locked (screensaver activated).")
             except Exception as e:
-                print(f"Error locking macOS: {e}")
+                log.warning("Error locking macOS: %s", e)
                 messagebox.showerror("锁屏失败", f"无法锁定macOS电脑: {e}")
         else:
             # For Linux, you would typically use a command like:
@@ -664,18 +1296,18 @@ class App(tk.Tk):
 
 
     def _show_media_popup_and_continue(self):
-        width = int(self.config_data.get("popup_width", 600))
-        height = int(self.config_data.get("popup_height", 400))
-        video_path = self.config_data.get("video_path", "")
+        width = self._popup_w
+        height = self._popup_h
+        video_path = self._video_path
 
         # Determine the next phase *before* the popup is shown
         next_phase = Phase.REST if self.current_phase == Phase.USE else Phase.USE
         
         # Check if lock screen is enabled for the *current* phase transition (i.e., when USE ends and REST begins)
-        enable_lock_for_rest = bool(self.config_data.get("enable_lock_screen", False)) and self.current_phase == Phase.USE
+        enable_lock_for_rest = self._enable_lock and self.current_phase == Phase.USE
 
         # If next is REST and fullscreen enabled → full screen modal (not used with lock screen for simplicity)
-        fullscreen = bool(self.config_data.get("fullscreen_rest", False)) and next_phase == Phase.REST and not enable_lock_for_rest
+        fullscreen = self._fullscreen_rest and next_phase == Phase.REST and not enable_lock_for_rest
         
         # --- MODIFIED: Removed the early return for enable_lock ---
         # The popup will now always display if a phase ends, regardless of lock screen setting.
@@ -684,18 +1316,30 @@ class App(tk.Tk):
 
         # 在创建窗口前计算与视频一致的纵横比
         calc_w, calc_h = width, height
+        cap_probe = None  # 探测时打开的 VideoCapture，交给 OpenCV 播放复用
         try:
             if video_path and os.path.exists(video_path):
                 vw = vh = None
-                if OPENCV_AVAILABLE:
+                # 分辨率按 (路径, 修改时间) 缓存，之后的周期无需再次探测
+                key = (video_path, os.stat(video_path).st_mtime_ns)
+                dims = self._video_dim_cache.get(key)
+                if dims is None:
+                    # 优先只读容器头；没有 ffprobe 时再打开完整的 VideoCapture
+                    dims = _probe_video_dims(video_path)
+                if dims is None and _try_import_cv2():
                     try:
-                        cap_probe = cv2.VideoCapture(video_path)
+                        cap_probe = _open_capture(video_path)
                         if cap_probe.isOpened():
-                            vw = int(cap_probe.get(cv2.CAP_PROP_FRAME_WIDTH))
-                            vh = int(cap_probe.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                        cap_probe.release()
+                            dims = (int(cap_probe.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                    int(cap_probe.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+                        else:
+                            cap_probe.release()
+                            cap_probe = None
                     except Exception:
                         pass
+                if dims:
+                    self._video_dim_cache[key] = dims
+                    vw, vh = dims
                 # 若拿到分辨率，则等比缩放到配置尺寸之内
                 if vw and vh and vw > 0 and vh > 0:
                     scale = min(width / vw, height / vh)
@@ -705,123 +1349,70 @@ class App(tk.Tk):
         except Exception:
             pass
 
-        popup = tk.Toplevel(self)
-        popup.title("时间到！")
-        if fullscreen:
-            popup.attributes("-fullscreen", True)
-            popup.overrideredirect(True)
-            popup.resizable(True, True)
-        else:
+        # 弹窗只创建一次，之后各周期复用
+        popup = self._ensure_popup()
+        popup._fullscreen = fullscreen
+        popup.overrideredirect(fullscreen)
+        popup.attributes("-fullscreen", fullscreen)
+        if not fullscreen:
             popup.geometry(f"{calc_w}x{calc_h}")
-            popup.resizable(True, True)
+        popup.deiconify()
+        popup.lift()
         try:
             if fullscreen:
                 popup.grab_set_global()  # stronger modal
             else:
                 popup.grab_set()
         except Exception:
-            popup.grab_set()
-        popup.attributes("-topmost", True)
-
-        frame = ttk.Frame(popup, padding=8)
-        frame.pack(fill=tk.BOTH, expand=True)
-
-        # 锁定：屏蔽关闭与快捷键，仅按钮可退出
-        def ignore_close():
-            if fullscreen:
-                return  # 忽略关闭
-            popup.destroy()
-
-        popup.protocol("WM_DELETE_WINDOW", ignore_close)
-        popup.bind("<Escape>", lambda e: "break")
-        popup.bind("<Alt-F4>", lambda e: "break")
-        popup.bind("<F11>", lambda e: "break")
-        # 禁用主窗口交互
-        try:
-            self.attributes("-disabled", True)
-        except Exception:
-            pass
+            try:
+                popup.grab_set()
+            except Exception:
+                pass
+        # grab 已阻止主窗口交互，无需再设置仅 Windows 支持的 -disabled
+        popup.focus_force()
 
-        # 仅视频
-        popup._video_cleanup = []  # store cleanup callbacks
+        # 仅视频：本周期的播放控件放在 popup._media 中，关闭时清空
+        frame = popup._media
+        popup._btn.configure(command=lambda: self._close_popup_and_start_next(popup))
 
         played = False
+        vlc_error = None
         video_path_check = video_path and os.path.exists(video_path)
         
         if video_path_check:
-            # Try OpenCV backend first (most compatible)
-            if OPENCV_AVAILABLE and not played:
+            # 按固定优先级尝试各后端，只在轮到时才导入对应模块
+            for backend in _VIDEO_BACKENDS:
                 try:
-                    canvas = tk.Canvas(frame, bg="#000")
-                    canvas.pack(fill=tk.BOTH, expand=True)
-                    self._play_video_with_opencv(canvas, video_path, popup)
-                    played = True
-                except Exception as e:
-                    try:
-                        canvas.destroy()
-                    except Exception:
-                        pass
-            
-            # Try tkintervideo as fallback
-            if TKINTERVIDEO_AVAILABLE and not played:
-                try:
-                    tk_player = TkinterVideo(master=frame, scaled=True, keep_aspect=True, bg="#000")
-                    tk_player.pack(fill=tk.BOTH, expand=True)
-                    tk_player.load(video_path)
-                    tk_player.play()
-                    played = True
-                    def _cleanup_tk():
+                    if backend == "vlc" and _try_import_vlc():
+                        self._play_video_with_vlc(frame, video_path, popup)
+                    elif backend == "opencv" and _try_import_cv2() and _try_import_pil():
+                        canvas = tk.Canvas(frame, bg="#000")
+                        canvas.pack(fill=tk.BOTH, expand=True)
+                        # 探测用的 VideoCapture 交由播放函数接管并负责释放
+                        cap, cap_probe = cap_probe, None
                         try:
-                            tk_player.stop()
+                            self._play_video_with_opencv(canvas, video_path, popup, cap)
                         except Exception:
-                            pass
-                    popup._video_cleanup.append(_cleanup_tk)
-                except Exception:
-                    try:
-                        tk_player.destroy()
-                    except Exception:
-                        pass
-
-            # Fallback to VLC backend
-            if VLC_AVAILABLE and not played:
-                try:
-                    prepare_vlc_on_windows()
-                except Exception:
-                    pass
-                container = tk.Frame(frame, bg="#000")
-                container.pack(fill=tk.BOTH, expand=True)
-                container.update_idletasks()
-                try:
-                    instance = vlc.Instance()
-                    media = instance.media_new(video_path)
-                    player = instance.media_player_new()
-                    player.set_media(media)
-                    hwnd = container.winfo_id()
-                    if sys.platform.startswith("win"):
-                        player.set_hwnd(hwnd)
-                    elif sys.platform == "darwin":
-                        player.set_nsobject(hwnd)
+                            canvas.destroy()
+                            raise
+                    elif backend == "tkintervideo" and _try_import_tkintervideo():
+                        self._play_video_with_tkintervideo(frame, video_path, popup)
                     else:
-                        player.set_xwindow(hwnd)
-                    player.play()
+                        continue
                     played = True
-                    def _cleanup_vlc():
-                        try:
-                            player.stop()
-                            player.release()
-                            instance.release()
-                        except Exception:
-                            pass
-                    popup._video_cleanup.append(_cleanup_vlc)
+                    break
                 except Exception as e:
-                    container.destroy()
-                    err = ttk.Label(frame, text=f"VLC 播放失败: {e}")
-                    err.pack(expand=True)
+                    if backend == "vlc":
+                        vlc_error = e
+
+        if cap_probe is not None:
+            cap_probe.release()
 
         if not played:
             # 分两个条件检查
             has_video = video_path_check
-            has_deps = TKINTERVIDEO_AVAILABLE or VLC_AVAILABLE or OPENCV_AVAILABLE
+            # 只查找不导入，避免仅为提示文字加载重量级模块
+            has_deps = any(_module_installed(m) for m in ("cv2", "tkintervideo", "vlc"))
             
             if not has_video:
                 msg_text = "⚠️ 未设置视频\n请在应用设置中选择视频文件"
@@ -832,49 +1423,99 @@ class App(tk.Tk):
             
             msg = ttk.Label(frame, text=msg_text, font=("Microsoft YaHei", 12))
             msg.pack(expand=True)
+            if vlc_error is not None:
+                err = ttk.Label(frame, text=f"VLC 播放失败: {vlc_error}")
+                err.pack(expand=True)
+
+    def _ensure_popup(self) -> tk.Toplevel:
+        """首次调用时创建提醒弹窗，之后各周期复用；关闭时只隐藏，不销毁。"""
+        popup = self._popup
+        if popup is not None and popup.winfo_exists():
+            return popup
 
-        btn = ttk.Button(frame, text="我知道了，开始下一段", command=lambda: self._close_popup_and_start_next(popup))
-        btn.pack(pady=8)
+        popup = tk.Toplevel(self)
+        popup.withdraw()
+        popup.title("时间到！")
+        popup.resizable(True, True)
+        popup.attributes("-topmost", True)
+        popup._fullscreen = False
+        # 播放函数登记的清理回调，_hide_popup 逐个调用后清空
+        popup._video_cleanup: list = []
+        popup._worker = None  # OpenCV 解码线程，见 _play_video_with_opencv
+        popup._visible = False
+
+        outer = ttk.Frame(popup, padding=8)
+        outer.pack(fill=tk.BOTH, expand=True)
+        popup._media = ttk.Frame(outer)
+        popup._media.pack(fill=tk.BOTH, expand=True)
+        popup._btn = ttk.Button(outer, text="我知道了，开始下一段")
+        popup._btn.pack(pady=8)
+
+        # 锁定：全屏时屏蔽关闭（Alt-F4 同样经由 WM_DELETE_WINDOW），仅按钮可退出
+        def ignore_close():
+            if popup._fullscreen:
+                return  # 忽略关闭
+            self._hide_popup(popup)
+
+        popup.protocol("WM_DELETE_WINDOW", ignore_close)
+        popup.bind("<Escape>", lambda e: "break")
+
+        # 弹窗隐藏/最小化时暂停 OpenCV 解码
+        def on_visibility(event, visible):
+            if event.widget is popup:
+                popup._visible = visible
+                if popup._worker is not None:
+                    popup._worker.set_visible(visible)
+
+        popup.bind("<Map>", lambda e: on_visibility(e, True))
+        popup.bind("<Unmap>", lambda e: on_visibility(e, False))
+
+        self._popup = popup
+        return popup
+
+    def _hide_popup(self, popup: tk.Toplevel):
+        """停止播放、清空本周期的播放控件并隐藏弹窗（留待下次复用）。"""
+        try:
+            popup.grab_release()
+        except Exception:
+            pass
+        # 逐个清理：某个后端清理失败不影响其余回调（例如不会漏掉释放 VLC 播放器）
+        for cb in popup._video_cleanup:
+            try:
+                cb()
+            except Exception as e:
+                log.debug("Video cleanup failed: %s", e)
+        popup._video_cleanup.clear()
+        for child in popup._media.winfo_children():
+            child.destroy()
+        popup.withdraw()
 
     # --- UPDATED _close_popup_and_start_next METHOD ---
     def _close_popup_and_start_next(self, popup: tk.Toplevel):
         # Determine the next phase *after* the current phase (which just ended)
         next_phase = Phase.REST if self.current_phase == Phase.USE else Phase.USE
-        enable_lock_for_rest = bool(self.config_data.get("enable_lock_screen", False)) and self.current_phase == Phase.USE
+        enable_lock_for_rest = self._enable_lock and self.current_phase == Phase.USE
         
         # Normal popup closing actions
-        try:
-            popup.grab_release()
-        except Exception:
-            pass
-        try:
-            self.attributes("-disabled", False)
-        except Exception:
-            pass
-        try:
-            for cb in getattr(popup, "_video_cleanup", []):
-                cb()
-        except Exception:
-            pass
-        popup.destroy()
+        self._hide_popup(popup)
 
         # Update phase and remaining seconds for the *next* phase
         self.current_phase = next_phase
         if self.current_phase == Phase.REST:
-            self.remaining_seconds = int(self.config_data.get("rest_seconds", 300))
+            self.remaining_seconds = self._rest_seconds
         else: # Phase.USE
-            self.remaining_seconds = int(self.config_data.get("use_seconds", 1500))
+            self.remaining_seconds = self._use_seconds
         self._update_labels()
 
         # If lock screen is enabled and it's time for the rest phase
         if enable_lock_for_rest:
             self._lock_computer()
             # After locking, *automatically start* the rest countdown in the background
-            print(f"Computer locked for {self.current_phase}. Starting countdown in background.")
+            log.debug("Computer locked for %s. Starting countdown in background.", self.current_phase)
             self.state = CountdownState.RUNNING # Change state to running for background countdown
             self.start_btn.config(state=tk.DISABLED)
-            self.pause_btn.config(state=tk.DISABLED, text="暂停 (已锁屏)") # Indicate visually that it's "paused" but actually counting down
-            self._tick() # Start the tick for the rest phase while locked
+            self._set_pause_btn(self._BTN_PAUSE_LOCKED_RUNNING) # Indicate visually that it's "paused" but actually counting down
+            self._start_ticker() # Start the tick for the rest phase while locked
         else:
             # If no lock screen, just proceed to start the next phase's countdown normally
             self.start_countdown()
@@ -883,49 +1524,69 @@ class App(tk.Tk):
 
     # Helpers
 
-    def _notify_phase_complete(self):
-        if self.config_data.get("enable_toast", True) and self._toaster is not None:
+    @property
+    def toaster(self):
+        """首次使用时才创建通知器：优先 WinRT，其次 win10toast；均不可用时返回 None。"""
+        if not self._toaster_checked:
+            self._toaster_checked = True
+            if os.name == "nt":
+                for available, factory in ((_try_import_winrt_toast, _WinRTToaster),
+                                           (_try_import_win10toast, _Win10Toaster)):
+                    try:
+                        if available():
+                            self._toaster = factory()
+                            break
+                    except Exception as e:
+                        log.debug("Toast notifier %s unavailable: %s", factory.__name__, e)
+        return self._toaster
+
+    def _show_notification(self, title, message):
+        """优先使用托盘图标的系统气泡通知，无托盘时回退到 toaster（WinRT 或 win10toast）。"""
+        icon = self._tray_icon
+        if icon is not None and getattr(icon, "HAS_NOTIFICATION", False):
             try:
-                title = "倒计时结束"
-                next_phase_name = "休息时间" if self.current_phase == Phase.USE else "使用时间"
-                self._toaster.show_toast(title, f"即将进入：{next_phase_name}", duration=3, threaded=True)
+                icon.notify(message, title)
+                return
+            except Exception:
+                pass
+        if self.toaster is not None:
+            try:
+                self.toaster.show(title, message)
             except Exception:
                 pass
 
-    # System tray
-    def _start_tray(self):
-        if not (self.config_data.get("enable_tray", True) and TRAY_AVAILABLE and PIL_AVAILABLE):
-            return
-        if self._tray_icon is not None:
-            return
-
-        # Simple in-memory icon
-        img = PILImage.new("RGBA", (64, 64), (30, 144, 255, 255))
-        # draw a simple dot/letter
-        try:
-            from PIL import ImageDraw
-            d = ImageDraw.Draw(img)
-            d.ellipse((12, 12, 52, 52), fill=(255, 255, 255, 255))
-        except Exception:
-            pass
+    def _notify_phase_complete(self):
+        if self._enable_toast:
+            next_phase_name = "休息时间" if self.current_phase == Phase.USE else "使用时间"
+            self._show_notification("倒计时结束", f"即将进入：{next_phase_name}")
 
+    # System tray
+    def _ui(self, *fns):
+        """在 Tk 主线程中依次执行 fns，合并为一次 after(0) 调度。"""
+        def run():
+            for fn in fns:
+                fn()
+        self.after(0, run)
+
+    def _build_tray_menu(self):
+        """创建托盘菜单；回调只引用 self，托盘重启时可直接复用。"""
+        # 托盘回调运行在 pystray 线程中，统一通过 _ui 转交 Tk 主线程
         def on_show(icon, item):
-            self.after(0, self.deiconify)
-            self.after(0, self.lift)
+            self._ui(self.deiconify, self.lift)
 
         def on_start(icon, item):
-            self.after(0, self.start_countdown)
+            self._ui(self.start_countdown)
 
         def on_pause(icon, item):
-            self.after(0, self.toggle_pause)
+            self._ui(self.toggle_pause)
 
         def on_reset(icon, item):
-            self.after(0, self.reset_countdown)
+            self._ui(self.reset_countdown)
 
         def on_quit(icon, item):
-            self.after(0, self._quit_app)
+            self._ui(self._quit_app)
 
-        menu = (
+        return pystray.Menu(
             pystray.MenuItem("显示窗口", on_show),
             pystray.MenuItem("开始", on_start),
             pystray.MenuItem("暂停/继续", on_pause),
@@ -933,7 +1594,18 @@ class App(tk.Tk):
             pystray.MenuItem("退出", on_quit),
         )
 
-        icon = pystray.Icon("Countdown", img, "倒计时", pystray.Menu(*menu))
+    def _start_tray(self):
+        if not (self._enable_tray and _try_import_pystray()):
+            return
+        if self._tray_icon is not None:
+            return
+
+        # Simple in-memory icon
+        img = _make_tray_icon()
+        if self._tray_menu is None:
+            self._tray_menu = self._build_tray_menu()
+
+        icon = pystray.Icon("Countdown", img, "倒计时", self._tray_menu)
         self._tray_icon = icon
 
         threading.Thread(target=icon.run, daemon=True).start()
@@ -947,32 +1619,39 @@ class App(tk.Tk):
             self._tray_icon = None
 
     def _restart_tray_if_needed(self):
-        if self.config_data.get("enable_tray", True):
+        if self._enable_tray:
             if self._tray_icon is None:
                 self._start_tray()
         else:
             self._stop_tray()
 
+    def withdraw(self):
+        self._ui_visible = False
+        super().withdraw()
+
+    def deiconify(self):
+        super().deiconify()
+        self._ui_visible = True
+        self._update_labels()
+
     def _on_window_close(self):
-        if self.config_data.get("enable_tray", True) and TRAY_AVAILABLE:
+        if self._enable_tray and _try_import_pystray():
             self.withdraw()
-            if self.config_data.get("enable_toast", True) and self._toaster is not None:
-                try:
-                    self._toaster.show_toast("最小化到托盘", "应用在系统托盘运行", duration=3, threaded=True)
-                except Exception:
-                    pass
+            if self._enable_toast:
+                self._show_notification("最小化到托盘", "应用在系统托盘运行")
         else:
             self._quit_app()
 
     def _quit_app(self):
         self._stop_tray()
-        if self.hwnd and WINDOWS_SCREEN_STATUS_AVAILABLE:
+        if self.hwnd:
             try:
-                win32gui.UnregisterSessionNotification(self.hwnd)
-                win32gui.DestroyWindow(self.hwnd)
-                print("Windows session notifications unregistered.")
+                self._wtsapi32.WTSUnRegisterSessionNotification(self.hwnd)
+                self._user32.DestroyWindow(self.hwnd)
+                self.hwnd = None
+                log.debug("Windows session notifications unregistered.")
             except Exception as e:
-                print(f"Error unregistering Windows session notifications: {e}")
+                log.warning("Error unregistering Windows session notifications: %s", e)
         self.destroy()
 
 